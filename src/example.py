@@ -3,13 +3,15 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import atexit
+import functools
 import resource_uri_utils
-from azure.core.exceptions import AzureError
+from concurrent.futures import ThreadPoolExecutor
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
 from azure.mgmt.netapp import NetAppManagementClient
 from azure.mgmt.netapp.models import NetAppAccount, CapacityPool, Volume, ExportPolicyRule, \
     VolumePropertiesExportPolicy, VolumePropertiesDataProtection, ReplicationObject, AuthorizeRequest
-from azure.mgmt.resource import ResourceManagementClient
-from sample_utils import mirror_state, console_output, print_header, get_credentials, resource_exists, wait_for_mirror_state, wait_for_no_anf_resource, wait_for_anf_resource
+from sample_utils import mirror_state, console_output, print_header, get_credentials, get_http_transport, wait_for_mirror_state, wait_for_no_anf_resource, wait_for_anf_resource, wait_for_many_anf_resources
 
 
 # ------------------------------------------IMPORTANT------------------------------------------------------------------
@@ -39,6 +41,20 @@ SECONDARY_VOLUME_NAME = "[Secondary ANF Volume Name]"
 CAPACITY_POOL_SIZE = 4398046511104  # 4TiB which is minimum size
 VOLUME_SIZE = 107374182400  # 100GiB - volume minimum size
 
+# Interval used to poll long-running operations, SDK default is 30 seconds
+LRO_POLLING_INTERVAL_IN_SEC = 5
+
+# NFSv4.1 export policy shared by primary and secondary volumes
+DEFAULT_EXPORT_POLICY = VolumePropertiesExportPolicy(rules=[ExportPolicyRule(
+    allowed_clients="0.0.0.0/0",
+    cifs=False,
+    nfsv3=False,
+    nfsv41=True,
+    rule_index=1,
+    unix_read_only=False,
+    unix_read_write=True
+)])
+
 # Change this to 'True' to enable cleanup process
 CLEANUP_RESOURCES = False
 
@@ -47,7 +63,8 @@ def create_account(anf_client, resource_group_name, anf_account_name, location,
     """Creates an Azure NetApp Files Account
 
     Function that creates an Azure NetApp Files Account, which requires building the
-    account body object first.
+    account body object first. It returns once the creation is started, the
+    resource is available through the poller result.
 
     Args:
         anf_client (NetAppManagementClient): Azure Resource Provider
@@ -61,14 +78,15 @@ def create_account(anf_client, resource_group_name, anf_account_name, location,
             value is None. E.g. {'cc':'1234','dept':'IT'}
 
     Returns:
-        NetAppAccount: Returns the newly created NetAppAccount resource
+        LROPoller: Returns the poller of the NetAppAccount being created
     """
     account_body = NetAppAccount(location=location,
                                  tags=tags)
 
     return anf_client.accounts.begin_create_or_update(resource_group_name,
                                                 anf_account_name,
-                                                account_body).result()
+                                                account_body,
+                                                polling_interval=LRO_POLLING_INTERVAL_IN_SEC)
 
 
 def create_capacity_pool(anf_client, resource_group_name, anf_account_name,
@@ -76,7 +94,8 @@ def create_capacity_pool(anf_client, resource_group_name, anf_account_name,
     """Creates a capacity pool within an account
 
     Function that creates a Capacity Pool. Capacity pools are needed to define
-    maximum service level and capacity.
+    maximum service level and capacity. It returns once the creation is
+    started, the resource is available through the poller result.
 
     Args:
         anf_client (NetAppManagementClient): Azure Resource Provider
@@ -97,7 +116,7 @@ def create_capacity_pool(anf_client, resource_group_name, anf_account_name,
             value is None. E.g. {'cc':'1234','dept':'IT'}
 
     Returns:
-        CapacityPool: Returns the newly created capacity pool resource
+        LROPoller: Returns the poller of the capacity pool being created
     """
     capacity_pool_body = CapacityPool(location=location,
                                       service_level="Standard",
@@ -106,7 +125,8 @@ def create_capacity_pool(anf_client, resource_group_name, anf_account_name,
     return anf_client.pools.begin_create_or_update(resource_group_name,
                                              anf_account_name,
                                              capacity_pool_name,
-                                             capacity_pool_body).result()
+                                             capacity_pool_body,
+                                             polling_interval=LRO_POLLING_INTERVAL_IN_SEC)
 
 
 def create_volume(anf_client, resource_group_name, anf_account_name,
@@ -117,7 +137,8 @@ def create_volume(anf_client, resource_group_name, anf_account_name,
     Function that in this example creates a NFSv4.1 volume within a capacity
     pool, as a note service level needs to be the same as the capacity pool.
     This function also defines the volume body as the configuration settings
-    of the new volume.
+    of the new volume. It returns once the creation is started, the resource
+    is available through the poller result.
 
     Args:
         anf_client (NetAppManagementClient): Azure Resource Provider
@@ -141,20 +162,8 @@ def create_volume(anf_client, resource_group_name, anf_account_name,
             value is None. E.g. {'cc':'1234','dept':'IT'}
 
     Returns:
-        Volume: Returns the newly created volume resource
+        LROPoller: Returns the poller of the volume being created
     """
-    rules = [ExportPolicyRule(
-        allowed_clients="0.0.0.0/0",
-        cifs=False,
-        nfsv3=False,
-        nfsv41=True,
-        rule_index=1,
-        unix_read_only=False,
-        unix_read_write=True
-    )]
-
-    export_policies = VolumePropertiesExportPolicy(rules=rules)
-
     volume_type = None
     # volume_type must be set to "DataProtection" when volume is a destination volume in replication
     if data_protection is not None and data_protection.replication.endpoint_type == "dst":
@@ -167,7 +176,7 @@ def create_volume(anf_client, resource_group_name, anf_account_name,
         service_level="Standard",
         subnet_id=subnet_id,
         protocol_types=["NFSv4.1"],
-        export_policy=export_policies,
+        export_policy=DEFAULT_EXPORT_POLICY,
         data_protection=data_protection,
         volume_type=volume_type
     )
@@ -176,7 +185,205 @@ def create_volume(anf_client, resource_group_name, anf_account_name,
                                                anf_account_name,
                                                capacity_pool_name,
                                                volume_name,
-                                               volume_body).result()
+                                               volume_body,
+                                               polling_interval=LRO_POLLING_INTERVAL_IN_SEC)
+
+
+def begin_creation(create_function, resource_type, *args):
+    """Starts a resource creation
+
+    Function that calls create_account, create_capacity_pool or
+    create_volume, which send their initial request right away, and reports
+    a rejected request the same way get_created_resource reports a failed
+    creation.
+
+    Args:
+        create_function (function): One of the create functions above
+        resource_type (string): Resource type name used in the messages, e.g.
+            "Capacity Pool"
+        args: Arguments passed to the create function
+
+    Returns:
+        LROPoller: Returns the poller of the resource being created
+    """
+    try:
+        return create_function(*args)
+    except HttpResponseError as ex:
+        console_output("An error occurred while creating {}: {}".format(resource_type, ex.message))
+        raise
+
+
+def get_created_resource(poller, resource_type):
+    """Waits for a resource creation to complete
+
+    Function that blocks on the poller returned by begin_creation and
+    reports the outcome, so the primary and secondary resources share the
+    same error handling.
+
+    Args:
+        poller (LROPoller): Poller of the resource being created
+        resource_type (string): Resource type name used in the messages, e.g.
+            "Capacity Pool"
+
+    Returns:
+        object: Returns the newly created resource
+    """
+    try:
+        resource = poller.result()
+    except HttpResponseError as ex:
+        console_output("An error occurred while creating {}: {}".format(resource_type, ex.message))
+        raise
+
+    console_output("\t{} successfully created. Resource id: {}".format(resource_type, resource.id))
+    return resource
+
+
+def delete_replication(anf_client, volume_id):
+    """Deletes the replication of a destination volume
+
+    Function that breaks and then deletes the replication attached to a
+    destination volume, which erases the replication for both destination
+    and source volumes. Volumes that are not a replication destination are
+    left untouched.
+
+    Args:
+        anf_client (NetAppManagementClient): Azure Resource Provider
+            Client designed to interact with ANF resources
+        volume_id (string): Resource id of the volume
+    """
+    parsed_id = resource_uri_utils.parse_anf_resource_id(volume_id)
+
+    current_volume = anf_client.volumes.get(parsed_id.resource_group, parsed_id.account, parsed_id.pool, parsed_id.volume)
+
+    # If the volume is a destination volume, the replication must be broken and deleted
+    if current_volume.data_protection.replication is not None and \
+        (current_volume.data_protection.replication.endpoint_type == "dst" or current_volume.data_protection.replication.additional_properties["endPointType"] == "Dst"):
+        console_output("Deleting replication on Volume {}".format(volume_id))
+        try:
+            wait_for_mirror_state(anf_client, parsed_id.resource_group, parsed_id.account, parsed_id.pool, parsed_id.volume, mirror_state.MIRRORED)
+
+            anf_client.volumes.begin_break_replication(parsed_id.resource_group,
+                                                       parsed_id.account,
+                                                       parsed_id.pool,
+                                                       parsed_id.volume,
+                                                       polling_interval=LRO_POLLING_INTERVAL_IN_SEC).wait()
+        except ResourceNotFoundError:
+            # If replication is not found then the volume can be safely deleted
+            return
+        except HttpResponseError as e:
+            console_output("An error occurred while breaking replication: {}".format(e.message))
+            raise
+
+        try:
+            wait_for_mirror_state(anf_client, parsed_id.resource_group, parsed_id.account, parsed_id.pool, parsed_id.volume, mirror_state.BROKEN)
+
+            anf_client.volumes.begin_delete_replication(parsed_id.resource_group,
+                                                        parsed_id.account,
+                                                        parsed_id.pool,
+                                                        parsed_id.volume,
+                                                        polling_interval=LRO_POLLING_INTERVAL_IN_SEC).wait()
+
+            # Wait for replication to finish deleting
+            wait_for_no_anf_resource(anf_client, volume_id, replication=True)
+            console_output("\tSuccessfully deleted replication on Volume {}".format(volume_id))
+        except ResourceNotFoundError:
+            # If replication is not found then the volume can be safely deleted
+            pass
+        except HttpResponseError as e:
+            console_output("An error occurred while deleting replication: {}".format(e.message))
+            raise
+
+
+def delete_volume(anf_client, volume_id):
+    """Deletes a volume
+
+    Function that deletes a volume and waits until it is no longer found.
+
+    Args:
+        anf_client (NetAppManagementClient): Azure Resource Provider
+            Client designed to interact with ANF resources
+        volume_id (string): Resource id of the volume
+    """
+    parsed_id = resource_uri_utils.parse_anf_resource_id(volume_id)
+
+    console_output("Deleting Volume {}".format(volume_id))
+    anf_client.volumes.begin_delete(parsed_id.resource_group,
+                                    parsed_id.account,
+                                    parsed_id.pool,
+                                    parsed_id.volume,
+                                    polling_interval=LRO_POLLING_INTERVAL_IN_SEC).wait()
+
+    # ARM workaround to wait for the deletion to complete
+    wait_for_no_anf_resource(anf_client, volume_id)
+    console_output("\tSuccessfully deleted Volume {}".format(volume_id))
+
+
+def delete_capacity_pool(anf_client, pool_id):
+    """Deletes a capacity pool
+
+    Function that deletes a capacity pool and waits until it is no longer
+    found. All volumes within the pool must be deleted first.
+
+    Args:
+        anf_client (NetAppManagementClient): Azure Resource Provider
+            Client designed to interact with ANF resources
+        pool_id (string): Resource id of the capacity pool
+    """
+    parsed_id = resource_uri_utils.parse_anf_resource_id(pool_id)
+
+    console_output("Deleting Capacity Pool {}".format(pool_id))
+    anf_client.pools.begin_delete(parsed_id.resource_group,
+                                  parsed_id.account,
+                                  parsed_id.pool,
+                                  polling_interval=LRO_POLLING_INTERVAL_IN_SEC).wait()
+
+    # ARM workaround to wait for the deletion to complete
+    wait_for_no_anf_resource(anf_client, pool_id)
+    console_output("\tSuccessfully deleted Capacity Pool {}".format(pool_id))
+
+
+def delete_account(anf_client, account_id):
+    """Deletes an Azure NetApp Files Account
+
+    Function that deletes an account and waits until it is no longer found.
+    All capacity pools within the account must be deleted first.
+
+    Args:
+        anf_client (NetAppManagementClient): Azure Resource Provider
+            Client designed to interact with ANF resources
+        account_id (string): Resource id of the account
+    """
+    parsed_id = resource_uri_utils.parse_anf_resource_id(account_id)
+
+    console_output("Deleting Account {}".format(account_id))
+    anf_client.accounts.begin_delete(parsed_id.resource_group,
+                                     parsed_id.account,
+                                     polling_interval=LRO_POLLING_INTERVAL_IN_SEC).wait()
+
+    # ARM workaround to wait for the deletion to complete
+    wait_for_no_anf_resource(anf_client, account_id)
+    console_output("\tSuccessfully deleted Account {}".format(account_id))
+
+
+@functools.lru_cache(maxsize=1)
+def get_anf_client():
+    """Gets the Azure NetApp Files management client
+
+    Function that authenticates using the service principal and instantiates
+    the management client only once, later calls reuse the same credential,
+    access token and connection pool. The client is closed on exit.
+
+    Returns:
+        NetAppManagementClient: Returns the Azure NetApp Files management client
+        string: Returns the subscription id associated by default to the service principal
+    """
+    # Authenticating using service principal, refer to README.md file for requirement details
+    credentials, subscription_id = get_credentials()
+
+    anf_client = NetAppManagementClient(credentials, subscription_id, transport=get_http_transport())
+    atexit.register(anf_client.close)
+
+    return anf_client, subscription_id
 
 
 def run_example():
@@ -187,134 +394,97 @@ def run_example():
                  "NFS v4.1 Volume. Then it creates secondary resources and a "
                  "Data Replication Volume.")
 
-    # Authenticating using service principal, refer to README.md file for requirement details
-    credentials, subscription_id = get_credentials()
-
     console_output("Instantiating a new Azure NetApp Files management client...")
-    anf_client = NetAppManagementClient(credentials, subscription_id)
+    anf_client, subscription_id = get_anf_client()
 
-    console_output("Creating Primary ANF Resources...")
-    # Creating ANF Primary Account
-    console_output("Creating Primary Account...")
+    primary_subnet_id = f'/subscriptions/{subscription_id}/resourceGroups/{PRIMARY_RESOURCE_GROUP_NAME}/providers/Microsoft.Network/virtualNetworks/{PRIMARY_VNET_NAME}/subnets/{PRIMARY_SUBNET_NAME}'
+    secondary_subnet_id = f'/subscriptions/{subscription_id}/resourceGroups/{SECONDARY_RESOURCE_GROUP_NAME}/providers/Microsoft.Network/virtualNetworks/{SECONDARY_VNET_NAME}/subnets/{SECONDARY_SUBNET_NAME}'
 
-    primary_account = None
-    try:
-        primary_account = create_account(anf_client,
-                                         PRIMARY_RESOURCE_GROUP_NAME,
-                                         PRIMARY_ANF_ACCOUNT_NAME,
-                                         PRIMARY_LOCATION)
-
-        console_output("\tAccount successfully created. Resource id: {}".format(primary_account.id))
-    except AzureError as ex:
-        console_output("An error occurred while creating Account: {}".format(ex.message))
-        raise
-
-    # Creating Primary Capacity Pool
-    console_output("Creating Primary Capacity Pool...")
+    # Primary resources and the secondary Account/Capacity Pool don't depend on each
+    # other, so both chains are provisioned at the same time. The primary chain is
+    # always advanced first, so waiting on secondary resources never delays it
+    console_output("Creating Primary and Secondary ANF Resources...")
 
-    primary_capacity_pool = None
-    try:
-        primary_capacity_pool = create_capacity_pool(anf_client,
-                                                     PRIMARY_RESOURCE_GROUP_NAME,
-                                                     primary_account.name,
-                                                     PRIMARY_CAPACITY_POOL_NAME,
-                                                     CAPACITY_POOL_SIZE,
-                                                     PRIMARY_LOCATION)
-
-        console_output("\tCapacity Pool successfully created. Resource id: {}".format(primary_capacity_pool.id))
-    except AzureError as ex:
-        console_output("An error occurred while creating Capacity Pool: {}".format(ex.message))
-        raise
+    console_output("Creating Primary Account...")
+    primary_account_poller = begin_creation(create_account, "Account",
+                                            anf_client,
+                                            PRIMARY_RESOURCE_GROUP_NAME,
+                                            PRIMARY_ANF_ACCOUNT_NAME,
+                                            PRIMARY_LOCATION)
 
-    # Creating Primary Volume
-    console_output("Creating Primary Volume...")
-    primary_subnet_id = '/subscriptions/{}/resourceGroups/{}/providers/Microsoft.Network/virtualNetworks/{}/subnets/{}'.format(
-        subscription_id, PRIMARY_RESOURCE_GROUP_NAME, PRIMARY_VNET_NAME, PRIMARY_SUBNET_NAME)
+    console_output("Creating Secondary Account...")
+    secondary_account_poller = begin_creation(create_account, "Account",
+                                              anf_client,
+                                              SECONDARY_RESOURCE_GROUP_NAME,
+                                              SECONDARY_ANF_ACCOUNT_NAME,
+                                              SECONDARY_LOCATION)
 
-    primary_volume = None
-    try:
-        pool_name = resource_uri_utils.get_anf_capacity_pool(primary_capacity_pool.id)
-
-        primary_volume = create_volume(anf_client,
-                                       PRIMARY_RESOURCE_GROUP_NAME,
-                                       primary_account.name,
-                                       pool_name,
-                                       PRIMARY_VOLUME_NAME,
-                                       VOLUME_SIZE,
-                                       primary_subnet_id,
-                                       PRIMARY_LOCATION)
-
-        console_output("\tVolume successfully created. Resource id: {}".format(primary_volume.id))
-    except AzureError as ex:
-        console_output("An error occurred while creating Volume: {}".format(ex.message))
-        raise
+    primary_account = get_created_resource(primary_account_poller, "Account")
 
-    # Wait for primary volume to be ready
-    console_output("Waiting for {} to be available...".format(resource_uri_utils.get_anf_volume(primary_volume.id)))
-    wait_for_anf_resource(anf_client, primary_volume.id)
+    console_output("Creating Primary Capacity Pool...")
+    primary_capacity_pool_poller = begin_creation(create_capacity_pool, "Capacity Pool",
+                                                  anf_client,
+                                                  PRIMARY_RESOURCE_GROUP_NAME,
+                                                  primary_account.name,
+                                                  PRIMARY_CAPACITY_POOL_NAME,
+                                                  CAPACITY_POOL_SIZE,
+                                                  PRIMARY_LOCATION)
 
-    console_output("Creating Secondary ANF Resources...")
-    # Creating ANF Secondary Account
-    console_output("Creating Secondary Account...")
+    primary_capacity_pool = get_created_resource(primary_capacity_pool_poller, "Capacity Pool")
 
-    secondary_account = None
-    try:
-        secondary_account = create_account(anf_client,
-                                           SECONDARY_RESOURCE_GROUP_NAME,
-                                           SECONDARY_ANF_ACCOUNT_NAME,
-                                           SECONDARY_LOCATION)
-
-        console_output("\tAccount successfully created. Resource id: {}".format(secondary_account.id))
-    except AzureError as ex:
-        console_output("An error occurred while creating Account: {}".format(ex.message))
-        raise
+    console_output("Creating Primary Volume...")
+    primary_volume_poller = begin_creation(create_volume, "Volume",
+                                           anf_client,
+                                           PRIMARY_RESOURCE_GROUP_NAME,
+                                           primary_account.name,
+                                           PRIMARY_CAPACITY_POOL_NAME,
+                                           PRIMARY_VOLUME_NAME,
+                                           VOLUME_SIZE,
+                                           primary_subnet_id,
+                                           PRIMARY_LOCATION)
+
+    # The primary volume is the longest step, the secondary chain is completed while it runs
+    secondary_account = get_created_resource(secondary_account_poller, "Account")
 
-    # Creating Secondary Capacity Pool
     console_output("Creating Secondary Capacity Pool...")
-
-    secondary_capacity_pool = None
-    try:
-        secondary_capacity_pool = create_capacity_pool(anf_client,
-                                                       SECONDARY_RESOURCE_GROUP_NAME,
-                                                       secondary_account.name,
-                                                       SECONDARY_CAPACITY_POOL_NAME,
-                                                       CAPACITY_POOL_SIZE,
-                                                       SECONDARY_LOCATION)
-
-        console_output("\tCapacity Pool successfully created. Resource id: {}".format(secondary_capacity_pool.id))
-    except AzureError as ex:
-        console_output("An error occurred while creating Capacity Pool: {}".format(ex.message))
-        raise
-
-    # Creating Secondary Volume
+    secondary_capacity_pool_poller = begin_creation(create_capacity_pool, "Capacity Pool",
+                                                    anf_client,
+                                                    SECONDARY_RESOURCE_GROUP_NAME,
+                                                    secondary_account.name,
+                                                    SECONDARY_CAPACITY_POOL_NAME,
+                                                    CAPACITY_POOL_SIZE,
+                                                    SECONDARY_LOCATION)
+
+    secondary_capacity_pool = get_created_resource(secondary_capacity_pool_poller, "Capacity Pool")
+    primary_volume = get_created_resource(primary_volume_poller, "Volume")
+
+    # Creating Secondary Volume, it needs the primary volume resource id
     console_output("Creating Secondary Volume...")
-    secondary_subnet_id = '/subscriptions/{}/resourceGroups/{}/providers/Microsoft.Network/virtualNetworks/{}/subnets/{}'.format(
-        subscription_id, SECONDARY_RESOURCE_GROUP_NAME, SECONDARY_VNET_NAME, SECONDARY_SUBNET_NAME)
-
-    data_replication_volume = None
-    try:
-        replication_object = ReplicationObject(endpoint_type="dst", remote_volume_region=PRIMARY_LOCATION, remote_volume_resource_id=primary_volume.id, replication_schedule="hourly")
-        data_protection_object = VolumePropertiesDataProtection(replication=replication_object)
-
-        pool_name = resource_uri_utils.get_anf_capacity_pool(secondary_capacity_pool.id)
-
-        data_replication_volume = create_volume(anf_client,
-                                                SECONDARY_RESOURCE_GROUP_NAME,
-                                                secondary_account.name,
-                                                pool_name,
-                                                SECONDARY_VOLUME_NAME,
-                                                VOLUME_SIZE,
-                                                secondary_subnet_id,
-                                                SECONDARY_LOCATION,
-                                                data_protection_object)
-        console_output("\tVolume successfully created. Resource id: {}".format(data_replication_volume.id))
-    except AzureError as ex:
-        console_output("An error occurred while creating Volume: {}".format(ex.message))
-        raise
-
-    # Wait for data replication volume to be ready
-    console_output("Waiting for {} to be available...".format(resource_uri_utils.get_anf_volume(data_replication_volume.id)))
-    wait_for_anf_resource(anf_client, data_replication_volume.id)
+    replication_object = ReplicationObject(endpoint_type="dst", remote_volume_region=PRIMARY_LOCATION, remote_volume_resource_id=primary_volume.id, replication_schedule="hourly")
+    data_protection_object = VolumePropertiesDataProtection(replication=replication_object)
+
+    data_replication_volume_poller = begin_creation(create_volume, "Volume",
+                                                    anf_client,
+                                                    SECONDARY_RESOURCE_GROUP_NAME,
+                                                    secondary_account.name,
+                                                    SECONDARY_CAPACITY_POOL_NAME,
+                                                    SECONDARY_VOLUME_NAME,
+                                                    VOLUME_SIZE,
+                                                    secondary_subnet_id,
+                                                    SECONDARY_LOCATION,
+                                                    data_protection_object)
+
+    data_replication_volume = get_created_resource(data_replication_volume_poller, "Volume")
+
+    # The create pollers only return volumes that reached Succeeded (Failed or Canceled raise),
+    # so no polling is expected here. This is a defensive fallback in case a volume is ever
+    # returned in another state, any such volumes are polled in a single batch request
+    pending_volume_ids = [volume.id for volume in [primary_volume, data_replication_volume]
+                          if volume.provisioning_state != "Succeeded"]
+    if pending_volume_ids:
+        console_output("Waiting for {} to be available...".format(
+            ", ".join(resource_uri_utils.get_anf_volume(volume_id) for volume_id in pending_volume_ids)))
+        wait_for_many_anf_resources(anf_client, pending_volume_ids)
 
     console_output("Authorizing replication in source region...")
     # Authorize replication between the two volumes
@@ -324,7 +494,8 @@ def run_example():
                                              resource_uri_utils.get_anf_account(primary_account.id),
                                              resource_uri_utils.get_anf_capacity_pool(primary_capacity_pool.id),
                                              resource_uri_utils.get_anf_volume(primary_volume.id),
-                                             authorization_replication_body).wait()
+                                             authorization_replication_body,
+                                             polling_interval=LRO_POLLING_INTERVAL_IN_SEC).wait()
 
     # Wait for replication to initialize on source volume
     wait_for_anf_resource(anf_client, primary_volume.id, replication=True)
@@ -343,69 +514,26 @@ def run_example():
         # Cleaning up volumes
         console_output("Deleting Volumes...")
 
-        # We need to break and then remove the replication attached to the destination 
-        # volume before we can delete either volume in a replication. As a result, volumes
-        # must be deleted in the order of destination and then source in this code.
-        # First, we check if the volume is a destination volume and act accordingly.
+        # We need to break and then remove the replication attached to the destination
+        # volume before we can delete either volume in a replication. As a result, the
+        # replication is removed first and only then the volumes are deleted.
         # Note that we need to delete the replication using the destination volume's id
-        # This erases the replication for both destination and source volumes.
+        # This erases the replication for both destination and source volumes, but the
+        # source side is torn down asynchronously, so we also wait for the replication to
+        # disappear from the source volume before deleting it.
+        # Once no volume has a replication left they are deleted at the same time, this is
+        # allowed since they live in different capacity pools and volume deletions are only
+        # serialized within a pool.
         try:
             volume_ids = [data_replication_volume.id, primary_volume.id]
             for volume_id in volume_ids:
+                delete_replication(anf_client, volume_id)
+
+            wait_for_no_anf_resource(anf_client, primary_volume.id, replication=True)
 
-                resource_group = resource_uri_utils.get_resource_group(volume_id)
-                account_name = resource_uri_utils.get_anf_account(volume_id)
-                pool_name = resource_uri_utils.get_anf_capacity_pool(volume_id)
-                volume_name = resource_uri_utils.get_anf_volume(volume_id)
-
-                current_volume = anf_client.volumes.get(resource_group, account_name, pool_name, volume_name)
-
-                # If the volume is a destination volume, the replication must be broken and deleted
-                if current_volume.data_protection.replication is not None and \
-                    (current_volume.data_protection.replication.endpoint_type == "dst" or current_volume.data_protection.replication.additional_properties["endPointType"] == "Dst"):
-                    console_output("Deleting replication on Volume {}".format(volume_id))
-                    try:
-                        wait_for_mirror_state(anf_client, resource_group, account_name, pool_name, volume_name, mirror_state.MIRRORED)
-
-                        anf_client.volumes.begin_break_replication(resource_group,
-                                                                account_name,
-                                                                pool_name,
-                                                                volume_name).wait()
-                    except AzureError as e:
-                        if e.status_code == 404: # If replication is not found then the volume can be safely deleted. Therefore we pass on this error and proceed to delete the volume
-                            pass
-                        else: # Throw all other exceptions
-                            console_output("An error occurred while breaking replication: {}".format(e.message))
-                            raise
-                    
-                    try:
-                        wait_for_mirror_state(anf_client, resource_group, account_name, pool_name, volume_name, mirror_state.BROKEN)
-
-                        anf_client.volumes.begin_delete_replication(resource_group,
-                                                            account_name,
-                                                            pool_name,
-                                                            volume_name).wait()
-
-                        # Wait for replication to finish deleting
-                        wait_for_no_anf_resource(anf_client, volume_id, replication=True)
-                        console_output("\tSuccessfully deleted replication on Volume {}".format(volume_id))
-                    except AzureError as e:
-                        if e.status_code == 404: # If replication is not found then the volume can be safely deleted. Therefore we pass on this error and proceed to delete the volume
-                            pass
-                        else: # Throw all other exceptions
-                            console_output("An error occurred while deleting replication: {}".format(e.message))
-                            raise
-
-                console_output("Deleting Volume {}".format(volume_id))
-                anf_client.volumes.begin_delete(resource_group,
-                                          account_name,
-                                          pool_name,
-                                          volume_name).wait()
-
-                # ARM workaround to wait for the deletion to complete
-                wait_for_no_anf_resource(anf_client, volume_id)
-                console_output("\tSuccessfully deleted Volume {}".format(volume_id))
-        except AzureError as ex:
+            with ThreadPoolExecutor(max_workers=len(volume_ids)) as executor:
+                list(executor.map(lambda volume_id: delete_volume(anf_client, volume_id), volume_ids))
+        except HttpResponseError as ex:
             console_output("An error occurred while deleting volumes: {}".format(ex.message))
             raise
 
@@ -414,22 +542,9 @@ def run_example():
 
         try:
             pool_ids = [primary_capacity_pool.id, secondary_capacity_pool.id]
-            for pool_id in pool_ids:
-
-                resource_group = resource_uri_utils.get_resource_group(pool_id)
-                account_name = resource_uri_utils.get_anf_account(pool_id)
-                pool_name = resource_uri_utils.get_anf_capacity_pool(pool_id)
-
-                console_output("Deleting Capacity Pool {}".format(pool_id))
-
-                anf_client.pools.begin_delete(resource_group,
-                                        account_name,
-                                        pool_name).wait()
-
-                # ARM workaround to wait for the deletion to complete
-                wait_for_no_anf_resource(anf_client, pool_id)
-                console_output("\tSuccessfully deleted Capacity Pool {}".format(pool_id))
-        except AzureError as ex:
+            with ThreadPoolExecutor(max_workers=len(pool_ids)) as executor:
+                list(executor.map(lambda pool_id: delete_capacity_pool(anf_client, pool_id), pool_ids))
+        except HttpResponseError as ex:
             console_output("An error occurred while deleting capacity pools: {}".format(ex.message))
             raise
 
@@ -438,20 +553,9 @@ def run_example():
 
         try:
             account_ids = [primary_account.id, secondary_account.id]
-            for account_id in account_ids:
-
-                resource_group = resource_uri_utils.get_resource_group(account_id)
-                account_name = resource_uri_utils.get_anf_account(account_id)
-
-                console_output("Deleting Account {}".format(account_id))
-
-                anf_client.accounts.begin_delete(resource_group,
-                                           account_name).wait()
-
-                # ARM workaround to wait for the deletion to complete
-                wait_for_no_anf_resource(anf_client, account_id)
-                console_output("\tSuccessfully deleted Account {}".format(account_id))
-        except AzureError as ex:
+            with ThreadPoolExecutor(max_workers=len(account_ids)) as executor:
+                list(executor.map(lambda account_id: delete_account(anf_client, account_id), account_ids))
+        except HttpResponseError as ex:
             console_output("An error occurred while deleting accounts: {}".format(ex.message))
             raise
 
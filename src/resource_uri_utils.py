@@ -3,7 +3,14 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import functools
+from collections import namedtuple
 
+
+AnfResourceId = namedtuple('AnfResourceId', 'resource_group account pool volume')
+
+
+@functools.lru_cache(maxsize=256)
 def get_resource_value(resource_uri, resource_name):
     """Gets the resource name based on resource type
 
@@ -46,6 +53,7 @@ def get_resource_value(resource_uri, resource_name):
     return None
 
 
+@functools.lru_cache(maxsize=256)
 def get_resource_name(resource_uri):
     """Gets the resource name from resource id/uri
 
@@ -66,6 +74,7 @@ def get_resource_name(resource_uri):
     return resource_uri[position + 1:]
 
 
+@functools.lru_cache(maxsize=256)
 def get_resource_group(resource_uri):
     """Gets the resource group name from resource id/uri
 
@@ -84,6 +93,7 @@ def get_resource_group(resource_uri):
     return get_resource_value(resource_uri, '/resourceGroups')
 
 
+@functools.lru_cache(maxsize=256)
 def get_subscription(resource_uri):
     """Gets the subscription id from resource id/uri
 
@@ -102,6 +112,7 @@ def get_subscription(resource_uri):
     return get_resource_value(resource_uri, '/subscriptions')
 
 
+@functools.lru_cache(maxsize=256)
 def get_anf_account(resource_uri):
     """Gets an account name from resource id/uri
 
@@ -120,6 +131,7 @@ def get_anf_account(resource_uri):
     return get_resource_value(resource_uri, '/netAppAccounts')
 
 
+@functools.lru_cache(maxsize=256)
 def get_anf_capacity_pool(resource_uri):
     """Gets pool name from resource id/uri
 
@@ -138,6 +150,7 @@ def get_anf_capacity_pool(resource_uri):
     return get_resource_value(resource_uri, '/capacityPools')
 
 
+@functools.lru_cache(maxsize=256)
 def get_anf_volume(resource_uri):
     """Gets volume name from resource id/uri
 
@@ -156,6 +169,7 @@ def get_anf_volume(resource_uri):
     return get_resource_value(resource_uri, '/volumes')
 
 
+@functools.lru_cache(maxsize=256)
 def get_anf_snapshot(resource_uri):
     """Gets snapshot name from resource id/uri
 
@@ -174,6 +188,30 @@ def get_anf_snapshot(resource_uri):
     return get_resource_value(resource_uri, '/snapshots')
 
 
+def parse_anf_resource_id(resource_uri):
+    """Parses an ANF resource id/uri in a single pass
+
+    Function that splits an ANF account, capacity pool or volume resource
+    id/uri once and returns all of its names, instead of scanning the
+    uri once per resource type
+
+    Args:
+        resource_uri (string): resource id/uri
+
+    Returns:
+        AnfResourceId: Returns the resource group, account, pool and volume
+            names, the ones not present in the uri are None
+    """
+
+    # /subscriptions/{}/resourceGroups/{}/providers/Microsoft.NetApp/netAppAccounts/{}/capacityPools/{}/volumes/{}
+    parts = resource_uri.strip('/').split('/')
+
+    def part(index):
+        return parts[index] if len(parts) > index else None
+
+    return AnfResourceId(part(3), part(7), part(9), part(11))
+
+
 def is_anf_resource(resource_uri):
     """Checks if resource is an ANF related resource
 
@@ -6,15 +6,26 @@
 import sys
 import os
 import json
+import functools
+import threading
 import time
+import requests
 import resource_uri_utils
 from azure.core.exceptions import HttpResponseError, \
     ResourceNotFoundError
+from azure.core.pipeline.transport import RequestsTransport
+from azure.core.rest import HttpRequest
 from azure.identity import ClientSecretCredential
-from azure.mgmt.netapp import NetAppManagementClient
-from azure.mgmt.netapp.models import ReplicationStatus
 from datetime import datetime
 from enum import Enum
+from requests.adapters import HTTPAdapter
+
+# API versions used when polling resources through ARM batch requests
+ARM_BATCH_API_VERSION = '2020-06-01'
+ANF_API_VERSION = '2021-04-01'
+
+# Keeps lines printed from the concurrent cleanup threads from interleaving
+console_lock = threading.Lock()
 
 class mirror_state(Enum):
     UNINITIALIZED = "Uninitialized"
@@ -27,14 +38,17 @@ def print_header(header_string):
     print('-' * len(header_string))
 
 
+@functools.lru_cache(maxsize=1)
 def get_credentials():
     """Gets the file system secured secret
 
     Gets the service principal credential file from a folder path defined the
-    AZURE_AUTH_LOCATION environment variable to perform authentication.
+    AZURE_AUTH_LOCATION environment variable to perform authentication. The
+    credential is created once so its access token is shared by all clients.
 
     Returns:
-        ServicePrincipalCredentials: Returns the Service Principal Credential object
+        ClientSecretCredential: Returns the Service Principal credential object,
+            which caches and refreshes its access token in-process
         string: Returns the subscription id associated by default to the service principal
     """
 
@@ -53,15 +67,39 @@ def get_credentials():
     return credentials, subscription_id
 
 
+def get_http_transport(pool_connections=20, pool_maxsize=50):
+    """Gets an HTTP transport backed by a pooled requests session
+
+    Creates a requests session with a larger connection pool so that the
+    many polling requests issued while waiting on resources reuse already
+    established TLS connections instead of opening new ones.
+
+    Args:
+        pool_connections (int): Number of connection pools to cache
+        pool_maxsize (int): Maximum number of connections kept per pool
+
+    Returns:
+        RequestsTransport: Returns the transport to be used by the client
+    """
+
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=pool_connections,
+                                          pool_maxsize=pool_maxsize,
+                                          pool_block=False))
+
+    return RequestsTransport(session=session, session_owner=True)
+
+
 def console_output(message):
     """Outputs a string to the console
 
-    Outputs a string with date/time
+    Outputs a string with date/time, it is safe to call from multiple threads
 
     Args:
         message (string): String value to be displayed
     """
-    print('{}: {}'.format(datetime.now(), message))
+    with console_lock:
+        print('{}: {}'.format(datetime.now(), message))
 
 
 def get_bytes_in_tib(size):
@@ -92,6 +130,35 @@ def get_tib_in_bytes(size):
     return size * 1024 * 1024 * 1024 * 1024
 
 
+def get_backoff_intervals(max_interval_in_sec, retries, initial_interval_in_sec=1, factor=1.5):
+    """Gets the intervals to sleep between polls
+
+    Generates exponentially growing intervals, starting small so fast
+    operations are detected right away and capped so long running ones are
+    not polled more often than needed. Intervals keep being generated until
+    they add up to max_interval_in_sec * retries, the same total wait as
+    polling at a fixed max_interval_in_sec.
+
+    Args:
+        max_interval_in_sec (int): Maximum interval used between checks
+        retries (int): Number of maximum intervals the total wait is based on
+        initial_interval_in_sec (int): Interval used before the first check
+        factor (float): Growth factor applied after each check
+
+    Returns:
+        generator: Yields the interval in seconds to wait before each check
+    """
+
+    total_wait_in_sec = max_interval_in_sec * retries
+    waited_in_sec = 0
+    interval = initial_interval_in_sec
+    while waited_in_sec < total_wait_in_sec:
+        current_interval = min(interval, max_interval_in_sec)
+        yield current_interval
+        waited_in_sec += current_interval
+        interval = interval * factor
+
+
 def wait_for_no_anf_resource(client, resource_id, interval_in_sec=10, retries=60, replication=None):
     """Waits for specific anf resource don't exist
 
@@ -103,12 +170,13 @@ def wait_for_no_anf_resource(client, resource_id, interval_in_sec=10, retries=60
         client (NetAppManagementClient): Azure Resource Provider
             Client designed to interact with ANF resources
         resource_id (string): Resource Id of the resource to be checked upon
-        interval_in_sec (int): Interval used between checks
-        retires (int): Number of times a poll will be performed
+        interval_in_sec (int): Maximum interval used between checks, polling
+            starts at one second and backs off up to this value
+        retries (int): Number of maximum intervals the total wait is based on
     """
 
-    for i in range(0, retries):
-        time.sleep(interval_in_sec)
+    for interval in get_backoff_intervals(interval_in_sec, retries):
+        time.sleep(interval)
         try:
             if resource_uri_utils.is_anf_snapshot(resource_id):
                 client.snapshots.get(
@@ -155,12 +223,13 @@ def wait_for_anf_resource(client, resource_id, interval_in_sec=10, retries=60, r
         client (NetAppManagementClient): Azure Resource Provider
             Client designed to interact with ANF resources
         resource_id (string): Resource Id of the resource to be checked upon
-        interval_in_sec (int): Interval used between checks
-        retires (int): Number of times a poll will be performed
+        interval_in_sec (int): Maximum interval used between checks, polling
+            starts at one second and backs off up to this value
+        retries (int): Number of maximum intervals the total wait is based on
     """
 
-    for i in range(0, retries):
-        time.sleep(interval_in_sec)
+    for interval in get_backoff_intervals(interval_in_sec, retries):
+        time.sleep(interval)
         try:
             if resource_uri_utils.is_anf_snapshot(resource_id):
                 client.snapshots.get(
@@ -198,6 +267,89 @@ def wait_for_anf_resource(client, resource_id, interval_in_sec=10, retries=60, r
             pass
 
 
+def send_arm_request(client, request):
+    """Sends a raw request to Azure Resource Manager
+
+    The NetAppManagementClient in azure-mgmt-netapp 3.0.0 doesn't expose a
+    public way to send arbitrary requests, so this function is the single
+    place that uses its underlying ARM pipeline client. The request goes
+    through the same credential, retry policy and pooled transport as every
+    other call made by the client.
+
+    Args:
+        client (NetAppManagementClient): Azure Resource Provider
+            Client designed to interact with ANF resources
+        request (HttpRequest): Request to be sent, its url can be relative
+            to the ARM endpoint or absolute
+
+    Returns:
+        HttpResponse: Returns the response of the request
+    """
+
+    pipeline_client = client._client
+    request.url = pipeline_client.format_url(request.url)
+
+    return pipeline_client.send_request(request)
+
+
+def wait_for_many_anf_resources(client, resource_ids, interval_in_sec=10, retries=60):
+    """Waits for several anf resources to be provisioned
+
+    This function checks if a set of ANF resources that were recently created
+    have all been provisioned. Instead of issuing one GET per resource, every
+    poll sends a single ARM batch request with all of them, following the
+    batch location while ARM reports it as still running. It breaks the wait
+    once all resources are found in Succeeded state or if polling reached out
+    maximum retries, and raises if the batch request itself fails.
+
+    Args:
+        client (NetAppManagementClient): Azure Resource Provider
+            Client designed to interact with ANF resources
+        resource_ids (list): Resource Ids of the resources to be checked upon
+        interval_in_sec (int): Maximum interval used between checks, polling
+            starts at one second and backs off up to this value
+        retries (int): Number of maximum intervals the total wait is based on
+    """
+
+    batch_body = {
+        'requests': [{
+            'httpMethod': 'GET',
+            'url': '{}?api-version={}'.format(resource_id, ANF_API_VERSION)
+        } for resource_id in resource_ids]
+    }
+
+    # Location of a batch accepted by ARM but not completed yet
+    location = None
+
+    for interval in get_backoff_intervals(interval_in_sec, retries):
+        time.sleep(interval)
+        if location is None:
+            request = HttpRequest('POST', '/batch',
+                                  params={'api-version': ARM_BATCH_API_VERSION},
+                                  headers={'Content-Type': 'application/json'},
+                                  json=batch_body)
+        else:
+            request = HttpRequest('GET', location)
+
+        response = send_arm_request(client, request)
+
+        # The batch is still running, keep polling its location instead of posting a new one
+        if response.status_code == 202:
+            location = response.headers.get('Location')
+            continue
+
+        if response.status_code != 200:
+            raise HttpResponseError(response=response)
+
+        location = None
+        responses = response.json().get('responses', [])
+        if len(responses) == len(resource_ids) and \
+            all(r.get('httpStatusCode') == 200 and
+                ((r.get('content') or {}).get('properties') or {}).get('provisioningState') == 'Succeeded'
+                for r in responses):
+            break
+
+
 def wait_for_mirror_state(client, resource_group, account_name, pool_name, volume_name, anticipated_mirror_state, interval_in_sec=10, retries=60):
     """Waits for a volume to have a particular mirror state
 
@@ -216,12 +368,13 @@ def wait_for_mirror_state(client, resource_group, account_name, pool_name, volum
         volume_name (string): Volume name
         anticipated_mirror_state (mirror_state): enum that represents which mirror 
             state we are waiting for
-        interval_in_sec (int): Interval used between checks
-        retires (int): Number of times a poll will be performed
+        interval_in_sec (int): Maximum interval used between checks, polling
+            starts at one second and backs off up to this value
+        retries (int): Number of maximum intervals the total wait is based on
     """
 
-    for i in range(retries):
-        time.sleep(interval_in_sec)
+    for interval in get_backoff_intervals(interval_in_sec, retries):
+        time.sleep(interval)
         current_status = client.volumes.replication_status(resource_group,
                                                             account_name,
                                                             pool_name,